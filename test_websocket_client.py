@@ -3,36 +3,137 @@
 WebSocket JSON-RPC Test Client
 
 A simple Python client to test the WebSocket JSON-RPC endpoint.
-Requires: pip install websockets asyncio
+Requires: pip install "websockets>=14" asyncio
+Optional: pip install orjson (faster JSON encoding/decoding)
+Optional: pip install uvloop (faster event loop)
+Optional: pip install aioconsole (async input for interactive mode)
 
 Usage:
     python test_websocket_client.py
+    python test_websocket_client.py --verbose      # log every frame
+    python test_websocket_client.py --interactive
+    python test_websocket_client.py --load <clients> <iterations>
 """
 
 import asyncio
-import json
+import itertools
+import logging
 import sys
+import time
 
 try:
-    import websockets
+    import orjson
+
+    def _dumps(obj) -> str:
+        # orjson returns bytes; decode so requests still go out as text frames
+        return orjson.dumps(obj).decode()
+
+    _dumpb = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    import json
+
+    def _dumpb(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+    _dumps = json.dumps
+    _loads = json.loads
+
+try:
+    import uvloop
 except ImportError:
-    print("Error: websockets library not installed")
-    print("Install with: pip install websockets")
+    uvloop = None
+
+try:
+    from aioconsole import ainput
+except ImportError:
+    async def ainput(prompt: str = "") -> str:
+        return await asyncio.to_thread(input, prompt)
+
+try:
+    from websockets.asyncio.client import connect as ws_connect
+    from websockets.version import version as ws_version
+
+    # send(..., text=True) needs websockets 14; 13 already has the asyncio
+    # client, so the import alone doesn't enforce it
+    if int(ws_version.split(".")[0]) < 14:
+        raise ImportError(f"websockets {ws_version} is too old")
+except ImportError:
+    print("Error: websockets>=14 library not installed")
+    print('Install with: pip install "websockets>=14"')
     sys.exit(1)
 
+log = logging.getLogger("jsonrpc_client")
+
+
+def _check(condition, message: str):
+    """Fail a test; unlike assert, this still runs under python -O"""
+    if not condition:
+        raise AssertionError(message)
+
+
+_RULE = "=" * 50
+_BANNER = "\n" + _RULE
+
+
+def _response_id(message: str):
+    """
+    Extract the id of a response frame without decoding the whole frame
+
+    The server serializes `id` as the last member of every response, so
+    only the tail after the last `"id":` needs decoding. Anything else falls
+    back to a full decode.
+    """
+    _, sep, tail = message.rpartition('"id":')
+    if sep and tail.endswith("}"):
+        try:
+            return _loads(tail[:-1])
+        except ValueError:
+            pass
+    return _loads(message).get("id")
+
+
+# Error codes the server sends with a null id while answering a request:
+# Parse error (the id couldn't be read) and Internal error (the response
+# couldn't be serialized)
+_UNRECOVERABLE_ID_ERRORS = (-32700, -32603)
+
+
+def _error_code(message: str):
+    """Return the error code of a response frame, or None if it isn't an error"""
+    response = _loads(message)
+    if isinstance(response, dict) and isinstance(response.get("error"), dict):
+        return response["error"].get("code")
+    return None
+
 
 class JsonRpcClient:
     """JSON-RPC WebSocket Client"""
 
-    def __init__(self, url: str = "ws://127.0.0.1:3000/live"):
+    def __init__(self, url: str = "ws://127.0.0.1:3000/live", keepalive: bool = True):
         self.url = url
+        self.keepalive = keepalive
         self.websocket = None
-        self.request_id = 1
+        self._next_id = itertools.count(1).__next__
+        self._request_prefixes = {}
+        self._pending = {}
+        self._reader = None
 
     async def connect(self):
         """Connect to the WebSocket server"""
         try:
-            self.websocket = await websockets.connect(self.url)
+            # Requests are small JSON documents, so per-message deflate only
+            # adds overhead; disable it and don't cap the incoming frame size.
+            # Keepalive pings (websockets' default 20s interval) can be turned
+            # off for load tests, where every connection would run its own
+            # ping timer task.
+            self.websocket = await ws_connect(
+                self.url,
+                compression=None,
+                max_size=None,
+                ping_interval=20 if self.keepalive else None,
+            )
+            self._reader = asyncio.create_task(self._read_responses())
             print(f"✓ Connected to {self.url}")
         except Exception as e:
             print(f"✗ Failed to connect: {e}")
@@ -42,8 +143,42 @@ class JsonRpcClient:
         """Disconnect from the WebSocket server"""
         if self.websocket:
             await self.websocket.close()
+            if self._reader:
+                await self._reader
+                self._reader = None
             print("✓ Disconnected")
 
+    async def _read_responses(self):
+        """Receive frames and hand each raw frame to the request with matching id"""
+        try:
+            async for message in self.websocket:
+                if log.isEnabledFor(logging.DEBUG):
+                    log.debug("← Received: %s", message)
+                response_id = _response_id(message)
+                if (
+                    response_id is None
+                    and self._pending
+                    and _error_code(message) in _UNRECOVERABLE_ID_ERRORS
+                ):
+                    # Best effort: the server couldn't recover the id, and it
+                    # answers frames in order, so hand the error to the oldest
+                    # request still pending. Other null-id errors (such as an
+                    # invalid notification) don't answer a request and are
+                    # only logged.
+                    response_id = next(iter(self._pending))
+                future = self._pending.pop(response_id, None)
+                if future and not future.done():
+                    future.set_result(message)
+        except Exception as e:
+            error = e
+        else:
+            error = Exception("Connection closed")
+
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        self._pending.clear()
+
     async def send_request(self, method: str, params=None, request_id=None):
         """
         Send a JSON-RPC request
@@ -54,36 +189,68 @@ class JsonRpcClient:
             request_id: Optional request ID (if None, auto-increments)
 
         Returns:
-            The response from the server
+            The decoded response from the server
+        """
+        return _loads(await self.send_raw(method, params, request_id))
+
+    async def send_raw(self, method: str, params=None, request_id=None) -> str:
+        """
+        Send a JSON-RPC request and return the response frame undecoded
+
+        Args:
+            method: The method name to call
+            params: Optional parameters (dict or list)
+            request_id: Optional request ID (if None, auto-increments)
+
+        Returns:
+            The raw JSON text of the response
         """
         if not self.websocket:
             raise Exception("Not connected")
+        if self._reader is None or self._reader.done():
+            # Nothing would ever resolve the response future
+            raise Exception("Response reader stopped; reconnect to continue")
 
-        # Build request
-        request = {
-            "jsonrpc": "2.0",
-            "method": method
-        }
-
-        if params is not None:
-            request["params"] = params
+        # Build request from the cached, pre-encoded envelope prefix for this
+        # method, so only the id and params need encoding per call
+        prefix = self._request_prefixes.get(method)
+        if prefix is None:
+            prefix = b'{"jsonrpc":"2.0","method":' + _dumpb(method) + b',"id":'
+            self._request_prefixes[method] = prefix
 
         if request_id is None:
-            request["id"] = self.request_id
-            self.request_id += 1
+            request_id = self._next_id()
+            # Skip ids an explicit request_id has already claimed
+            while request_id in self._pending:
+                request_id = self._next_id()
+            id_json = str(request_id).encode()
         else:
-            request["id"] = request_id
+            if request_id in self._pending:
+                raise Exception(f"Request id {request_id!r} is already in flight")
+            id_json = _dumpb(request_id)
 
-        # Send request
-        request_json = json.dumps(request)
-        print(f"\n→ Sending: {request_json}")
-        await self.websocket.send(request_json)
+        if params is None:
+            request_json = prefix + id_json + b"}"
+        else:
+            request_json = prefix + id_json + b',"params":' + _dumpb(params) + b"}"
 
-        # Receive response
-        response = await self.websocket.recv()
-        print(f"← Received: {response}")
+        # Register before sending so the reader can't miss a fast response
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
 
-        return json.loads(response)
+        # Send request
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("→ Sending: %s", request_json.decode())
+        try:
+            # The request is already UTF-8; send it as a text frame since
+            # the server rejects binary messages
+            await self.websocket.send(request_json, text=True)
+        except Exception:
+            self._pending.pop(request_id, None)
+            raise
+
+        # Wait for the reader to deliver the matching response
+        return await future
 
     async def send_notification(self, method: str, params=None):
         """
@@ -96,7 +263,33 @@ class JsonRpcClient:
         if not self.websocket:
             raise Exception("Not connected")
 
-        # Build notification (no id field)
+        notification_json = self._encode_notification(method, params)
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("→ Sending notification: %s", notification_json)
+        await self.websocket.send(notification_json)
+
+    async def send_notifications(self, items):
+        """
+        Send a burst of JSON-RPC notifications without waiting between them
+
+        Each notification still goes out as its own message, since the server
+        parses one JSON-RPC object per frame.
+
+        Args:
+            items: Iterable of (method, params) pairs; params may be None
+        """
+        if not self.websocket:
+            raise Exception("Not connected")
+
+        payloads = [self._encode_notification(m, p) for m, p in items]
+        if log.isEnabledFor(logging.DEBUG):
+            for payload in payloads:
+                log.debug("→ Sending notification: %s", payload)
+        await asyncio.gather(*(self.websocket.send(p) for p in payloads))
+
+    @staticmethod
+    def _encode_notification(method: str, params=None) -> str:
+        """Encode a notification (a request with no id field)"""
         notification = {
             "jsonrpc": "2.0",
             "method": method
@@ -105,45 +298,114 @@ class JsonRpcClient:
         if params is not None:
             notification["params"] = params
 
-        # Send notification
-        notification_json = json.dumps(notification)
-        print(f"\n→ Sending notification: {notification_json}")
-        await self.websocket.send(notification_json)
-        print("  (No response expected for notifications)")
+        return _dumps(notification)
 
     async def ping(self):
         """Test ping method"""
-        print("\n" + "="*50)
-        print("Testing: ping")
-        print("="*50)
+        log.info("Testing: ping")
         response = await self.send_request("ping")
         return response
 
     async def echo(self, message: dict):
         """Test echo method"""
-        print("\n" + "="*50)
-        print("Testing: echo")
-        print("="*50)
+        log.info("Testing: echo")
         response = await self.send_request("echo", message)
         return response
 
     async def add(self, a: float, b: float):
         """Test add method"""
-        print("\n" + "="*50)
-        print("Testing: add")
-        print("="*50)
+        log.info("Testing: add")
         response = await self.send_request("add", [a, b])
         return response
 
     async def get_server_info(self):
         """Test getServerInfo method"""
-        print("\n" + "="*50)
-        print("Testing: getServerInfo")
-        print("="*50)
+        log.info("Testing: getServerInfo")
         response = await self.send_request("getServerInfo")
         return response
 
 
+# Frames one _run_suite iteration moves: six requests, their six responses,
+# one notification and a burst of ten notifications
+_SUITE_REQUESTS = 6
+_SUITE_NOTIFICATIONS = 1 + 10
+_SUITE_FRAMES = 2 * _SUITE_REQUESTS + _SUITE_NOTIFICATIONS
+
+
+async def _run_suite(client, report=None):
+    """
+    Run one iteration of the test suite on a connected client
+
+    Args:
+        client: A connected JsonRpcClient
+        report: Optional callable given a line for each passed test
+    """
+    # Tests 1-6 are independent, so send them all at once and let the
+    # reader match each response to its request by id
+    test_data = {"message": "Hello, WebSocket!", "number": 42}
+    (
+        ping_response,
+        echo_response,
+        add_response,
+        info_response,
+        not_found_response,
+        invalid_params_response,
+    ) = await asyncio.gather(
+        client.ping(),
+        client.echo(test_data),
+        client.add(15, 27),
+        client.get_server_info(),
+        client.send_raw("nonexistent_method"),
+        client.send_raw("add", [1]),  # Needs 2 params
+    )
+
+    # Test 1: Ping
+    _check("result" in ping_response, "ping returned no result")
+    _check(ping_response["result"]["pong"] is True, "ping did not return pong")
+    if report:
+        report("✓ Ping test passed")
+
+    # Test 2: Echo
+    _check(echo_response["result"] == test_data, "echo result differs from payload")
+    if report:
+        report("✓ Echo test passed")
+
+    # Test 3: Add
+    _check(add_response["result"] == 42, "add(15, 27) did not return 42")
+    if report:
+        report("✓ Add test passed")
+
+    # Test 4: Server Info
+    _check("result" in info_response, "getServerInfo returned no result")
+    _check(info_response["result"]["name"] == "webboard", "unexpected server name")
+    _check(info_response["result"]["jsonrpc_version"] == "2.0", "unexpected JSON-RPC version")
+    if report:
+        report("✓ Server info test passed")
+
+    # Test 5: Method not found (only the error code matters, so check
+    # the raw frame instead of decoding it)
+    _check('"code":-32601' in not_found_response, "expected Method not found (-32601)")
+    if report:
+        report("✓ Method not found error test passed")
+
+    # Test 6: Invalid params
+    _check('"code":-32602' in invalid_params_response, "expected Invalid params (-32602)")
+    if report:
+        report("✓ Invalid params error test passed")
+
+    # Test 7: Notification (no response)
+    await client.send_notification("echo", {"notify": "test"})
+    if report:
+        report("✓ Notification test passed")
+
+    # Test 8: Notification burst (no responses)
+    await client.send_notifications(
+        [("echo", {"notify": i}) for i in range(10)]
+    )
+    if report:
+        report("✓ Notification burst test passed")
+
+
 async def run_tests():
     """Run a comprehensive test suite"""
     client = JsonRpcClient()
@@ -152,55 +414,11 @@ async def run_tests():
         # Connect
         await client.connect()
 
-        # Test 1: Ping
-        response = await client.ping()
-        assert "result" in response
-        assert response["result"]["pong"] is True
-        print("✓ Ping test passed")
-
-        # Test 2: Echo
-        test_data = {"message": "Hello, WebSocket!", "number": 42}
-        response = await client.echo(test_data)
-        assert response["result"] == test_data
-        print("✓ Echo test passed")
-
-        # Test 3: Add
-        response = await client.add(15, 27)
-        assert response["result"] == 42
-        print("✓ Add test passed")
-
-        # Test 4: Server Info
-        response = await client.get_server_info()
-        assert "result" in response
-        assert response["result"]["name"] == "webboard"
-        assert response["result"]["jsonrpc_version"] == "2.0"
-        print("✓ Server info test passed")
-
-        # Test 5: Method not found
-        print("\n" + "="*50)
-        print("Testing: Method not found error")
-        print("="*50)
-        response = await client.send_request("nonexistent_method")
-        assert "error" in response
-        assert response["error"]["code"] == -32601
-        print("✓ Method not found error test passed")
-
-        # Test 6: Invalid params
-        print("\n" + "="*50)
-        print("Testing: Invalid parameters error")
-        print("="*50)
-        response = await client.send_request("add", [1])  # Needs 2 params
-        assert "error" in response
-        assert response["error"]["code"] == -32602
-        print("✓ Invalid params error test passed")
-
-        # Test 7: Notification (no response)
-        await client.send_notification("echo", {"notify": "test"})
-        print("✓ Notification test passed")
-
-        print("\n" + "="*50)
+        await _run_suite(client, report=print)
+
+        print(_BANNER)
         print("ALL TESTS PASSED! ✓")
-        print("="*50)
+        print(_RULE)
 
     except Exception as e:
         print(f"\n✗ Test failed: {e}")
@@ -211,6 +429,40 @@ async def run_tests():
         await client.disconnect()
 
 
+async def _one_client_suite(n_iters: int):
+    """Run the test suite n_iters times on one connection"""
+    client = JsonRpcClient(keepalive=False)
+
+    await client.connect()
+    try:
+        for _ in range(n_iters):
+            await _run_suite(client)
+    finally:
+        await client.disconnect()
+
+
+async def run_load(n_clients: int, n_iters: int):
+    """Run the test suite on n_clients concurrent connections"""
+    start = time.perf_counter()
+
+    try:
+        async with asyncio.TaskGroup() as tg:
+            for _ in range(n_clients):
+                tg.create_task(_one_client_suite(n_iters))
+    except Exception as e:
+        print(f"\n✗ Load test failed: {e!r}")
+        import traceback
+        traceback.print_exc()
+        return
+
+    elapsed = time.perf_counter() - start
+    frames = n_clients * n_iters * _SUITE_FRAMES
+    print(_BANNER)
+    print(f"{n_clients} clients x {n_iters} iterations: "
+          f"{frames} frames in {elapsed:.2f}s ({frames / elapsed:,.0f} frames/s)")
+    print(_RULE)
+
+
 async def interactive_mode():
     """Interactive mode for manual testing"""
     client = JsonRpcClient()
@@ -218,9 +470,9 @@ async def interactive_mode():
     try:
         await client.connect()
 
-        print("\n" + "="*50)
+        print(_BANNER)
         print("Interactive JSON-RPC Client")
-        print("="*50)
+        print(_RULE)
         print("\nCommands:")
         print("  ping              - Test ping method")
         print("  echo <message>    - Test echo method")
@@ -231,27 +483,30 @@ async def interactive_mode():
 
         while True:
             try:
-                command = input("\n> ").strip()
+                # Read without blocking the loop so the reader keeps
+                # draining frames pushed by the server between commands
+                command = (await ainput("\n> ")).strip()
 
                 if not command:
                     continue
 
-                if command == "quit":
+                # Split off the command name once and dispatch on it; commands
+                # without arguments must have none, echo and add need some
+                cmd, _, rest = command.partition(" ")
+
+                if cmd == "quit" and not rest:
                     break
-                elif command == "ping":
+                elif cmd == "ping" and not rest:
                     await client.ping()
-                elif command.startswith("echo "):
-                    message = command[5:]
-                    await client.echo({"message": message})
-                elif command.startswith("add "):
-                    parts = command.split()
-                    if len(parts) == 3:
-                        a = float(parts[1])
-                        b = float(parts[2])
-                        await client.add(a, b)
+                elif cmd == "echo" and rest:
+                    await client.echo({"message": rest})
+                elif cmd == "add" and rest:
+                    parts = rest.split()
+                    if len(parts) == 2:
+                        await client.add(float(parts[0]), float(parts[1]))
                     else:
                         print("Usage: add <number1> <number2>")
-                elif command == "info":
+                elif cmd == "info" and not rest:
                     await client.get_server_info()
                 else:
                     print(f"Unknown command: {command}")
@@ -266,18 +521,74 @@ async def interactive_mode():
         await client.disconnect()
 
 
+def run(coro):
+    """Run a coroutine to completion, on uvloop when it is installed"""
+    if uvloop is None:
+        return asyncio.run(coro)
+
+    if sys.version_info >= (3, 11):
+        with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+            return runner.run(coro)
+
+    uvloop.install()
+    return asyncio.run(coro)
+
+
 def main():
-    """Main entry point"""
+    """
+    Main entry point
+
+    The load test spends most of its time in the same send/receive path, so
+    it benefits from a JIT. Either run it under PyPy (3.11+, for TaskGroup):
+
+        pypy3 test_websocket_client.py --load 16 10000
+
+    or on CPython 3.13+ built with --enable-experimental-jit:
+
+        PYTHON_JIT=1 python3 test_websocket_client.py --load 16 10000
+
+    For short PyPy runs, a lower JIT threshold and a larger nursery help:
+
+        PYPY_GC_NURSERY=64M pypy3 --jit threshold=100 \\
+            test_websocket_client.py --load 16 10000
+
+    orjson and uvloop don't support PyPy, so there the client falls back to
+    the stdlib json module and the default event loop.
+    """
+    # Frame-level traffic is logged at DEBUG; interactive sessions show it
+    # by default since inspecting responses is the point of that mode.
+    interactive = "--interactive" in sys.argv
+    load = "--load" in sys.argv
+    verbose = interactive or "--verbose" in sys.argv
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if verbose:
+        log.setLevel(logging.DEBUG)
+    elif load:
+        # Per-test banners would flood the console under load
+        log.setLevel(logging.WARNING)
+    else:
+        log.setLevel(logging.INFO)
+
     print("WebSocket JSON-RPC Test Client")
-    print("="*50)
+    print(_RULE)
 
-    if len(sys.argv) > 1 and sys.argv[1] == "--interactive":
+    if interactive:
         print("Starting in interactive mode...")
-        asyncio.run(interactive_mode())
+        run(interactive_mode())
+    elif load:
+        index = sys.argv.index("--load")
+        try:
+            n_clients = int(sys.argv[index + 1])
+            n_iters = int(sys.argv[index + 2])
+        except (IndexError, ValueError):
+            print("Usage: --load <clients> <iterations>")
+            sys.exit(2)
+        print(f"Running load test ({n_clients} clients, {n_iters} iterations)...")
+        run(run_load(n_clients, n_iters))
     else:
         print("Running automated test suite...")
-        print("(Use --interactive for interactive mode)")
-        asyncio.run(run_tests())
+        print("(Use --interactive for interactive mode, --verbose to log every frame)")
+        run(run_tests())
 
 
 if __name__ == "__main__":